@@ -47,6 +47,7 @@ SEARCH STRATEGY:
 
 PAGE RETRIEVAL:
    - After finding relevant pages in search results, use wikipedia_get_page to get full content
+   - When retrieving 2 or more pages at once, use wikipedia_get_pages with a list of titles instead of calling wikipedia_get_page repeatedly
    - IMPORTANT: Retrieve only the most relevant pages (5-10 total), not all pages from every search
    - Select the 1-2 most relevant pages per search result, not all pages
    - Prioritize doing more searches over retrieving more pages
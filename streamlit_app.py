@@ -1,8 +1,8 @@
 import asyncio
-import json
 import logging
 from typing import Any
 
+import orjson
 import streamlit as st
 from jaxn import StreamingJSONParser
 
@@ -10,13 +10,6 @@ from config import DEFAULT_SEARCH_MODE, LOG_LEVEL, SearchMode
 from wikiagent.stream_handler import SearchAgentAnswerHandler
 from wikiagent.wikipagent import query_wikipedia_stream
 
-# Configure logging to display in terminal
-logging.basicConfig(
-    level=getattr(logging, LOG_LEVEL.upper(), logging.INFO),
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    datefmt="%H:%M:%S",
-)
-
 QUERY_TRUNCATION_LENGTH = 50
 MAX_QUESTION_LENGTH = 500
 MODE_OPTIONS = ["evaluation", "production", "research"]
@@ -27,6 +20,19 @@ st.set_page_config(
     layout="wide",
 )
 
+
+@st.cache_resource(show_spinner=False)
+def _configure_logging() -> None:
+    """Configure terminal logging once per server process, not on every rerun"""
+    logging.basicConfig(
+        level=getattr(logging, LOG_LEVEL.upper(), logging.INFO),
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+        datefmt="%H:%M:%S",
+    )
+
+
+_configure_logging()
+
 st.session_state.setdefault("messages", [])
 st.session_state.setdefault("streaming", False)
 st.session_state.setdefault("tool_calls", [])
@@ -57,23 +63,28 @@ async def run_agent_stream(
     handler.reset()
     parser = StreamingJSONParser(handler)
     tool_calls_list = []
+    tool_calls_lines: list[str] = []
 
     def _handle_tool_call(tool_name: str, args: str) -> None:
         try:
-            args_dict = json.loads(args) if isinstance(args, str) else args
+            args_dict = (
+                orjson.loads(args)
+                if isinstance(args, (str, bytes, bytearray))
+                else args
+            )
             query = (
                 args_dict.get("query", "N/A")
                 if isinstance(args_dict, dict)
                 else str(args)
             )[:QUERY_TRUNCATION_LENGTH]
-        except (json.JSONDecodeError, AttributeError, TypeError):
+        except (orjson.JSONDecodeError, AttributeError, TypeError):
             query = str(args)[:QUERY_TRUNCATION_LENGTH] if args else "N/A"
         tool_calls_list.append({"tool_name": tool_name, "query": query})
-        tool_calls_text = "\n".join(
-            f"🔍 {i+1}. **{c['tool_name']}**: {c['query']}..."
-            for i, c in enumerate(tool_calls_list)
+        # Format only the new call; earlier lines are reused as-is
+        tool_calls_lines.append(
+            f"🔍 {len(tool_calls_list)}. **{tool_name}**: {query}..."
         )
-        tool_calls_container.markdown(tool_calls_text)
+        tool_calls_container.markdown("\n".join(tool_calls_lines))
 
     def _handle_structured_output(delta: str) -> None:
         try:
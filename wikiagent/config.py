@@ -1,3 +1,4 @@
+import re
 from enum import StrEnum
 
 USER_AGENT = "WikipediaAgent/1.0 (https://github.com/yourusername/wikipedia-agent)"
@@ -16,6 +17,25 @@ class ErrorCategory(StrEnum):
 # With ~4 chars per token, 15000 chars ≈ 3750 tokens per page
 # With 15-20 pages, this keeps us under 128k token limit
 MAX_PAGE_CONTENT_LENGTH = 15000  # characters
+# Stop buffering the raw page once this many bytes are read
+# (UTF-8 uses at most 4 bytes per character; +1 char to detect truncation)
+MAX_PAGE_DOWNLOAD_BYTES = (MAX_PAGE_CONTENT_LENGTH + 1) * 4
+PAGE_DOWNLOAD_CHUNK_SIZE = 8192  # bytes
+
+# In-process memoization of Wikipedia responses
+# Agents repeat searches and page fetches within and across questions
+SEARCH_CACHE_SIZE = 256  # distinct queries
+PAGE_CACHE_SIZE = 256  # distinct pages (~60 KB each at most)
+
+# HTTP connection pooling for Wikipedia requests
+# The agent issues many calls per question against the same host,
+# so keep-alive connections are reused instead of re-doing TLS each time
+HTTP_POOL_CONNECTIONS = 4
+HTTP_POOL_MAXSIZE = 32
+# Transient failures (rate limiting, server hiccups) are retried with backoff
+HTTP_MAX_RETRIES = 2
+HTTP_RETRY_BACKOFF_FACTOR = 0.2  # seconds
+HTTP_RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
 
 # Test constants for agent tests
 # Using simpler, more direct questions for better testing
@@ -54,6 +74,11 @@ MIN_QUERY_LENGTH = 1
 MAX_QUERY_LENGTH = 300
 MIN_TITLE_LENGTH = 1
 MAX_TITLE_LENGTH = 255
+# MediaWiki allows 50 titles per query, but full wikitext for that many pages
+# can exceed the API's result size; keep batches small
+MAX_TITLES_PER_BATCH = 10
+# Sanity bound on titles per wikipedia_get_pages call (split into batches)
+MAX_TITLES_PER_CALL = 50
 
 # Error mappings for agent error handling
 ERROR_MAPPINGS = {
@@ -76,3 +101,18 @@ ERROR_MAPPINGS = {
         "keywords": ["timeout"],
     },
 }
+
+# Keyword -> category index for single-pass error classification
+# Built in ERROR_MAPPINGS order, so earlier categories win when several match
+ERROR_KEYWORD_INDEX = {
+    keyword: category
+    for category, mapping in ERROR_MAPPINGS.items()
+    for keyword in mapping["keywords"]
+}
+_ERROR_KEYWORD_RE = re.compile("|".join(map(re.escape, ERROR_KEYWORD_INDEX)))
+
+
+def categorize_error(text: str) -> ErrorCategory | None:
+    """Return the first error category with a keyword in the lowercased text"""
+    matched = {ERROR_KEYWORD_INDEX[kw] for kw in _ERROR_KEYWORD_RE.findall(text)}
+    return next((category for category in ERROR_MAPPINGS if category in matched), None)
@@ -1,7 +1,11 @@
 """Streaming JSON parser handler for SearchAgentAnswer structured output"""
 
+import time
+
 from jaxn import JSONParserHandler
 
+ANSWER_RENDER_INTERVAL = 0.05  # seconds; caps answer re-renders at ~20/s
+
 
 class SearchAgentAnswerHandler(JSONParserHandler):
     def __init__(
@@ -27,23 +31,38 @@ class SearchAgentAnswerHandler(JSONParserHandler):
         self.sources_container = sources_container
 
         # Track state for incremental updates
-        self.current_answer = ""
+        self._answer_parts: list[str] = []
         self.current_confidence: float | None = None
         self.current_reasoning: str | None = None
         self.sources_list: list[str] = []
+        self._sources_seen: set[str] = set()
+        self._sources_markdown = "**Sources:**"
+        self._last_answer_render = 0.0
+
+    @property
+    def current_answer(self) -> str:
+        """Answer text streamed so far"""
+        return "".join(self._answer_parts)
 
     def reset(self) -> None:
         """Reset handler state for a new query"""
-        self.current_answer = ""
+        self._answer_parts = []
         self.current_confidence = None
         self.current_reasoning = None
+        self._reset_sources()
+        self._last_answer_render = 0.0
+
+    def _reset_sources(self) -> None:
+        """Clear collected sources before a new sources_used array"""
         self.sources_list = []
+        self._sources_seen = set()
+        self._sources_markdown = "**Sources:**"
 
     def on_field_start(self, path: str, field_name: str) -> None:
         """Called when starting to read a field value"""
         # Initialize arrays when starting
         if field_name == "sources_used" and path == "":
-            self.sources_list = []
+            self._reset_sources()
 
     def on_field_end(
         self,
@@ -58,8 +77,9 @@ class SearchAgentAnswerHandler(JSONParserHandler):
         """
         if field_name == "answer" and path == "":
             # Ensure answer is fully displayed when field completes
-            if self.answer_container and self.current_answer:
-                self.answer_container.markdown(self.current_answer)
+            answer = self.current_answer
+            if self.answer_container and answer:
+                self.answer_container.markdown(answer)
 
         elif field_name == "confidence" and path == "":
             # Display confidence as a metric
@@ -83,10 +103,16 @@ class SearchAgentAnswerHandler(JSONParserHandler):
         Stream answer content as it arrives.
         """
         if field_name == "answer" and path == "":
-            # Accumulate answer text
-            self.current_answer += chunk
-            # Update Streamlit container with current answer
-            if self.answer_container:
+            # Accumulate answer chunks; joined only when rendered
+            self._answer_parts.append(chunk)
+            # Re-render at most every ANSWER_RENDER_INTERVAL; the full
+            # answer is always rendered once the field completes
+            now = time.monotonic()
+            if (
+                self.answer_container
+                and now - self._last_answer_render >= ANSWER_RENDER_INTERVAL
+            ):
+                self._last_answer_render = now
                 self.answer_container.markdown(self.current_answer)
 
     def on_array_item_end(
@@ -101,10 +127,11 @@ class SearchAgentAnswerHandler(JSONParserHandler):
 
         # Sources are strings in the array
         source = str(item).strip('"')
-        if not source or source in self.sources_list:
+        if not source or source in self._sources_seen:
             return
 
+        self._sources_seen.add(source)
         self.sources_list.append(source)
+        self._sources_markdown += f"\n- {source}"
         if self.sources_container:
-            sources_text = "\n".join(f"- {s}" for s in self.sources_list)
-            self.sources_container.markdown(f"**Sources:**\n{sources_text}")
+            self.sources_container.markdown(self._sources_markdown)
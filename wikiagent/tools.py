@@ -1,17 +1,78 @@
-from typing import List
-from urllib.parse import quote
+import threading
+from collections import OrderedDict
+from functools import lru_cache
 
+import orjson
 import requests
 from pydantic import ValidationError
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from wikiagent.config import (
+    HTTP_MAX_RETRIES,
+    HTTP_POOL_CONNECTIONS,
+    HTTP_POOL_MAXSIZE,
+    HTTP_RETRY_BACKOFF_FACTOR,
+    HTTP_RETRY_STATUS_CODES,
     MAX_PAGE_CONTENT_LENGTH,
+    MAX_PAGE_DOWNLOAD_BYTES,
     MAX_QUERY_LENGTH,
     MAX_TITLE_LENGTH,
+    MAX_TITLES_PER_BATCH,
+    MAX_TITLES_PER_CALL,
+    PAGE_CACHE_SIZE,
+    PAGE_DOWNLOAD_CHUNK_SIZE,
+    SEARCH_CACHE_SIZE,
     USER_AGENT,
 )
 from wikiagent.models import WikipediaPageContent, WikipediaSearchResult
 
+_API_URL = "https://en.wikipedia.org/w/api.php"
+_RAW_URL = "https://en.wikipedia.org/w/index.php"
+_SEARCH_PARAMS = {"action": "query", "format": "json", "list": "search"}
+_BATCH_PAGE_PARAMS = {
+    "action": "query",
+    "format": "json",
+    "formatversion": "2",
+    "prop": "revisions",
+    "rvprop": "content",
+    "rvslots": "main",
+}
+_ARTICLE_URL_PREFIX = "https://en.wikipedia.org/wiki/"
+_SPACE_TO_UNDERSCORE = str.maketrans({" ": "_"})
+
+
+def _create_session() -> requests.Session:
+    """Create a pooled HTTP session shared by all Wikipedia tool calls"""
+    session = requests.Session()
+    session.headers.update({"User-Agent": USER_AGENT})
+    # raise_on_status=False hands the last response back to raise_for_status,
+    # so exhausted retries surface as the usual HTTPError
+    retries = Retry(
+        total=HTTP_MAX_RETRIES,
+        backoff_factor=HTTP_RETRY_BACKOFF_FACTOR,
+        status_forcelist=HTTP_RETRY_STATUS_CODES,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=HTTP_POOL_CONNECTIONS,
+        pool_maxsize=HTTP_POOL_MAXSIZE,
+        max_retries=retries,
+    )
+    session.mount("https://", adapter)
+    return session
+
+
+_SESSION = _create_session()
+# Page prefixes keyed by underscored title, shared by the single-page and
+# batched tools; an explicit LRU so batch results can be stored too
+_PAGE_CACHE: OrderedDict[str, str] = OrderedDict()
+_PAGE_CACHE_LOCK = threading.Lock()
+_TRUNCATION_NOTICE = (
+    f"\n\n[Content truncated to {MAX_PAGE_CONTENT_LENGTH} characters. "
+    "Full page available at: {url}]"
+)
+
 
 def _validate_search_query(query: str) -> None:
     """Validate search query input before API call"""
@@ -29,59 +90,135 @@ def _validate_page_title(title: str) -> None:
         raise ValueError(f"Page title too long (max {MAX_TITLE_LENGTH} chars)")
 
 
-def wikipedia_search(query: str) -> List[WikipediaSearchResult]:
-    """
-    Search Wikipedia for pages matching the query.
+def _validate_page_titles(titles: list[str]) -> None:
+    """Validate a batch of page titles before API call"""
+    if not titles:
+        raise ValueError("Page titles cannot be empty")
+    if len(titles) > MAX_TITLES_PER_CALL:
+        raise ValueError(f"Too many page titles (max {MAX_TITLES_PER_CALL})")
+    for title in titles:
+        _validate_page_title(title)
+        if "|" in title:
+            raise ValueError(f"Page title cannot contain '|': {title}")
+
+
+def _truncate_content(content: str, wikipedia_url: str) -> str:
+    """Truncate page content to prevent context overflow"""
+    # Keep the beginning of the page which usually contains the most relevant information
+    if len(content) > MAX_PAGE_CONTENT_LENGTH:
+        # Add truncation indicator
+        content = content[:MAX_PAGE_CONTENT_LENGTH] + _TRUNCATION_NOTICE.format(
+            url=wikipedia_url
+        )
+    return content
 
-    Use this tool to find relevant Wikipedia pages for a topic.
-    The agent should use this first to discover which pages exist,
-    then use wikipedia_get_page to retrieve the full content.
 
-    Args:
-        query: Search query string (e.g., "capybara", "Python programming")
-               Spaces will be automatically converted to "+" for the API
+def _build_page_ref(title: str) -> tuple[str, str]:
+    """
+    Build the URL form of a page title and its article URL.
 
     Returns:
-        List of WikipediaSearchResult with title, snippet, page_id, etc.
+        Tuple of (underscored page title, article URL)
+    """
+    page_title = title.translate(_SPACE_TO_UNDERSCORE)
+    return page_title, _ARTICLE_URL_PREFIX + page_title
 
-    Raises:
-        ValueError: If input validation fails
-        RuntimeError: If the API request fails or returns invalid data
+
+def _read_page_content(response: requests.Response) -> str:
     """
-    _validate_search_query(query)
+    Read a streamed page body, buffering only what can survive truncation.
 
-    try:
-        search_query = query.replace(" ", "+")
+    The rest of the body is drained without buffering so the keep-alive
+    connection is returned to the session pool instead of being dropped.
+    """
+    buffer = bytearray()
+    chunks = response.iter_content(chunk_size=PAGE_DOWNLOAD_CHUNK_SIZE)
+    for chunk in chunks:
+        buffer.extend(chunk)
+        if len(buffer) >= MAX_PAGE_DOWNLOAD_BYTES:
+            break
+    for _ in chunks:
+        pass
+    return buffer.decode("utf-8", errors="replace")
+
+
+def _get_cached_page(page_title: str) -> str | None:
+    """Return cached page content, marking it as recently used"""
+    with _PAGE_CACHE_LOCK:
+        content = _PAGE_CACHE.get(page_title)
+        if content is not None:
+            _PAGE_CACHE.move_to_end(page_title)
+        return content
+
+
+def _cache_page(page_title: str, content: str) -> None:
+    """Store page content, evicting the least recently used page when full"""
+    with _PAGE_CACHE_LOCK:
+        _PAGE_CACHE[page_title] = content
+        _PAGE_CACHE.move_to_end(page_title)
+        if len(_PAGE_CACHE) > PAGE_CACHE_SIZE:
+            _PAGE_CACHE.popitem(last=False)
+
+
+def _fetch_page_content(page_title: str) -> str:
+    """
+    Download (the truncatable prefix of) a raw page.
 
-        url = f"https://en.wikipedia.org/w/api.php?action=query&format=json&list=search&srsearch={search_query}"
+    Memoized per title; failed requests raise and are therefore not cached.
+    """
+    content = _get_cached_page(page_title)
+    if content is not None:
+        return content
+    params = {"title": page_title, "action": "raw"}
+    with _SESSION.get(_RAW_URL, params=params, timeout=10, stream=True) as response:
+        response.raise_for_status()
+        content = _read_page_content(response)
+    _cache_page(page_title, content)
+    return content
 
-        headers = {"User-Agent": USER_AGENT}
-        response = requests.get(url, headers=headers, timeout=10)
+
+def _parse_search_items(search_items: list) -> list[WikipediaSearchResult]:
+    """
+    Build search results from raw API hits without re-validating them.
+
+    model_construct skips validation, so this is only for trusted, schema-stable
+    Wikipedia API output.
+    """
+    return [
+        WikipediaSearchResult.model_construct(
+            title=item.get("title", ""),
+            snippet=item.get("snippet"),
+            page_id=item.get("pageid"),
+            size=item.get("size"),
+            word_count=item.get("wordcount"),
+        )
+        for item in search_items
+    ]
+
+
+@lru_cache(maxsize=SEARCH_CACHE_SIZE)
+def _search_cached(query: str) -> tuple[WikipediaSearchResult, ...]:
+    """Run a search request; memoized per query, errors are not cached"""
+    try:
+        params = {**_SEARCH_PARAMS, "srsearch": query}
+
+        response = _SESSION.get(_API_URL, params=params, timeout=10)
         response.raise_for_status()
 
-        data = response.json()
+        data = orjson.loads(response.content)
 
-        search_results = []
         if "query" in data and "search" in data["query"]:
             search_items = data["query"]["search"]
             if not isinstance(search_items, list):
                 raise RuntimeError("Invalid API response: 'search' is not a list")
 
-            for item in search_items:
-                try:
-                    result = WikipediaSearchResult(
-                        title=item.get("title", ""),
-                        snippet=item.get("snippet"),
-                        page_id=item.get("pageid"),
-                        size=item.get("size"),
-                        word_count=item.get("wordcount"),
-                    )
-                    search_results.append(result)
-                except ValidationError:
-                    continue
-
-        return search_results
+            return tuple(_parse_search_items(search_items))
 
+        return ()
+
+    except orjson.JSONDecodeError as e:
+        # Subclass of ValueError, so it must be mapped before the re-raise below
+        raise RuntimeError(f"Failed to parse Wikipedia API response: {str(e)}")
     except ValueError:
         raise
     except requests.RequestException as e:
@@ -90,6 +227,30 @@ def wikipedia_search(query: str) -> List[WikipediaSearchResult]:
         raise RuntimeError(f"Failed to parse Wikipedia API response: {str(e)}")
 
 
+def wikipedia_search(query: str) -> list[WikipediaSearchResult]:
+    """
+    Search Wikipedia for pages matching the query.
+
+    Use this tool to find relevant Wikipedia pages for a topic.
+    The agent should use this first to discover which pages exist,
+    then use wikipedia_get_page to retrieve the full content.
+
+    Args:
+        query: Search query string (e.g., "capybara", "Python programming")
+               Spaces will be automatically converted to "+" for the API
+
+    Returns:
+        List of WikipediaSearchResult with title, snippet, page_id, etc.
+
+    Raises:
+        ValueError: If input validation fails
+        RuntimeError: If the API request fails or returns invalid data
+    """
+    _validate_search_query(query)
+    # Not lower-cased: CirrusSearch operators (OR, AND, NOT) are case-sensitive
+    return list(_search_cached(query.strip()))
+
+
 def wikipedia_get_page(title: str) -> WikipediaPageContent:
     """
     Get the raw wikitext content of a Wikipedia page.
@@ -116,50 +277,33 @@ def wikipedia_get_page(title: str) -> WikipediaPageContent:
         RuntimeError: If network error or HTTP error other than 404 occurs
     """
     _validate_page_title(title)
-    page_title = title.replace(" ", "_")
+    title = title.strip()
+    page_title, wikipedia_url = _build_page_ref(title)
 
     try:
-        # URL encode the title for safety
-        encoded_title = quote(page_title, safe="")
-
-        url = f"https://en.wikipedia.org/w/index.php?title={encoded_title}&action=raw"
-
-        headers = {"User-Agent": USER_AGENT}
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-
-        content = response.text
+        content = _fetch_page_content(page_title)
         if not content:
             raise RuntimeError(f"Empty content received for page: {title}")
 
-        # Truncate content to prevent context overflow
-        # Keep the beginning of the page which usually contains the most relevant information
-        if len(content) > MAX_PAGE_CONTENT_LENGTH:
-            content = content[:MAX_PAGE_CONTENT_LENGTH]
-            # Add truncation indicator
-            content += f"\n\n[Content truncated to {MAX_PAGE_CONTENT_LENGTH} characters. Full page available at: https://en.wikipedia.org/wiki/{page_title}]"
-
-        wikipedia_url = f"https://en.wikipedia.org/wiki/{page_title}"
-
         return WikipediaPageContent(
             title=title,
-            content=content,
+            content=_truncate_content(content, wikipedia_url),
             url=wikipedia_url,
         )
 
     except ValueError:
         raise
     except requests.HTTPError as e:
-        if e.response and e.response.status_code == 404:
+        status_code = e.response.status_code if e.response is not None else None
+        if status_code == 404:
             return WikipediaPageContent(
                 title=title,
                 content=f"[Page not found: {title} does not exist on Wikipedia]",
-                url=f"https://en.wikipedia.org/wiki/{page_title}",
+                url=wikipedia_url,
             )
         else:
-            status_code = e.response.status_code if e.response else "unknown"
             raise RuntimeError(
-                f"Failed to get Wikipedia page {title}: HTTP {status_code}"
+                f"Failed to get Wikipedia page {title}: HTTP {status_code or 'unknown'}"
             )
     except requests.RequestException as e:
         raise RuntimeError(f"Failed to get Wikipedia page {title}: {str(e)}")
@@ -169,5 +313,139 @@ def wikipedia_get_page(title: str) -> WikipediaPageContent:
         return WikipediaPageContent(
             title=title,
             content=f"[Error retrieving page: {title} - {str(e)}]",
-            url=f"https://en.wikipedia.org/wiki/{page_title}",
+            url=wikipedia_url,
+        )
+
+
+def _fetch_batch_pages(titles: list[str]) -> tuple[dict, dict]:
+    """
+    Run the batched revisions query, following API continuations.
+
+    When the combined wikitext exceeds the API's result size limit, some pages
+    come back without revisions plus a "continue" block; each continuation
+    returns at least one more page, so len(titles) requests always suffice.
+
+    Returns:
+        Tuple of (normalized title map, page entries keyed by title)
+    """
+    params = {**_BATCH_PAGE_PARAMS, "titles": "|".join(titles)}
+    normalized: dict[str, str] = {}
+    pages: dict[str, dict] = {}
+    for _ in range(len(titles)):
+        response = _SESSION.get(_API_URL, params=params, timeout=10)
+        response.raise_for_status()
+        data = orjson.loads(response.content)
+        query = data.get("query", {})
+        # The API answers with normalized titles ("capybara" -> "Capybara")
+        normalized.update((n["from"], n["to"]) for n in query.get("normalized", []))
+        for page in query.get("pages", []):
+            title = page.get("title")
+            if "revisions" in page or title not in pages:
+                pages[title] = page
+        if "continue" not in data:
+            break
+        params = {**params, **data["continue"]}
+    return normalized, pages
+
+
+def _batch_entry_content(entry: dict) -> str:
+    """Extract the wikitext of one page entry ("" if there is none)"""
+    try:
+        return entry["revisions"][0]["slots"]["main"]["content"]
+    except (KeyError, IndexError, TypeError):
+        return ""
+
+
+def _batch_entry_error(title: str, entry: dict | None) -> str:
+    """Describe why a batched page entry carried no content"""
+    if entry is None or "missing" in entry or "invalid" in entry:
+        return f"[Page not found: {title} does not exist on Wikipedia]"
+    if "revisions" not in entry:
+        # Omitted because the response hit the API's size limit
+        return (
+            f"[Content not returned for page: {title} - "
+            "retrieve it with wikipedia_get_page]"
         )
+    return f"[Error retrieving page: {title} - Empty content received]"
+
+
+def wikipedia_get_pages(titles: list[str]) -> list[WikipediaPageContent]:
+    """
+    Get the raw wikitext content of several Wikipedia pages in one request.
+
+    Use this tool instead of repeated wikipedia_get_page calls when
+    retrieving two or more pages found with wikipedia_search.
+
+    Error handling:
+    - Missing pages: Returns WikipediaPageContent with error message
+      (allows agent to continue processing other pages)
+    - Network errors and HTTP errors: Raises RuntimeError
+
+    Args:
+        titles: Wikipedia page titles exactly as returned from wikipedia_search
+                (at most 50)
+
+    Returns:
+        List of WikipediaPageContent in the same order as titles.
+
+    Raises:
+        ValueError: If input validation fails
+        RuntimeError: If the API request fails or returns invalid data
+    """
+    _validate_page_titles(titles)
+    titles = [title.strip() for title in titles]
+    refs = {title: _build_page_ref(title) for title in titles}
+
+    # Serve already downloaded pages from the cache, fetch only the rest
+    contents: dict[str, str] = {}
+    for title, (page_title, _) in refs.items():
+        content = _get_cached_page(page_title)
+        if content is not None:
+            contents[title] = content
+    to_fetch = [title for title in refs if title not in contents]
+
+    errors: dict[str, str] = {}
+    if to_fetch:
+        normalized: dict[str, str] = {}
+        pages: dict[str, dict] = {}
+        try:
+            # Small batches keep each response under the API's result size limit
+            for start in range(0, len(to_fetch), MAX_TITLES_PER_BATCH):
+                batch = to_fetch[start : start + MAX_TITLES_PER_BATCH]
+                batch_normalized, batch_pages = _fetch_batch_pages(batch)
+                normalized.update(batch_normalized)
+                pages.update(batch_pages)
+        except requests.RequestException as e:
+            raise RuntimeError(f"Failed to get Wikipedia pages: {str(e)}")
+        except (orjson.JSONDecodeError, AttributeError, KeyError, TypeError) as e:
+            raise RuntimeError(f"Failed to parse Wikipedia API response: {str(e)}")
+
+        for title in to_fetch:
+            entry = pages.get(normalized.get(title, title))
+            content = _batch_entry_content(entry) if entry else ""
+            if content:
+                # Cache only the prefix that can survive truncation
+                contents[title] = content[: MAX_PAGE_CONTENT_LENGTH + 1]
+                _cache_page(refs[title][0], contents[title])
+            else:
+                errors[title] = _batch_entry_error(title, entry)
+
+    return [
+        WikipediaPageContent(
+            title=title,
+            content=(
+                _truncate_content(contents[title], refs[title][1])
+                if title in contents
+                else errors[title]
+            ),
+            url=refs[title][1],
+        )
+        for title in titles
+    ]
+
+
+def clear_wikipedia_cache() -> None:
+    """Drop memoized search results and page downloads (e.g. between test runs)"""
+    _search_cached.cache_clear()
+    with _PAGE_CACHE_LOCK:
+        _PAGE_CACHE.clear()
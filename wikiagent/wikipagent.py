@@ -1,43 +1,61 @@
-import json
 import logging
-from collections.abc import Coroutine
+import re
+import time
+from collections.abc import AsyncIterable, Coroutine
+from dataclasses import dataclass, field
+from functools import lru_cache
 from typing import Any, Callable, List
 
+import orjson
 from pydantic_ai import Agent, ModelSettings
-from pydantic_ai.messages import FunctionToolCallEvent
+from pydantic_ai.messages import BaseToolCallPart, FunctionToolCallEvent
 from pydantic_ai.models.openai import OpenAIChatModel
 from pydantic_ai.providers.openai import OpenAIProvider
 
 from config import DEFAULT_MAX_TOKENS, DEFAULT_SEARCH_MODE, OPENAI_RAG_MODEL, SearchMode
 from config.adaptive_instructions import get_wikipedia_agent_instructions
-from wikiagent.config import ERROR_MAPPINGS, MAX_QUESTION_LOG_LENGTH, ErrorCategory
+from wikiagent.config import ERROR_MAPPINGS, MAX_QUESTION_LOG_LENGTH, categorize_error
 from wikiagent.models import (
     AgentError,
     SearchAgentAnswer,
     TokenUsage,
     WikipediaAgentResponse,
 )
-from wikiagent.tools import wikipedia_get_page, wikipedia_search
+from wikiagent.tools import wikipedia_get_page, wikipedia_get_pages, wikipedia_search
 
 logger = logging.getLogger(__name__)
 
 QUERY_DISPLAY_LENGTH = 50
 STREAM_DEBOUNCE = 0.01
-STRUCTURED_OUTPUT_FIELDS = ["answer", "confidence", "sources_used", "reasoning"]
+STREAM_COALESCE_INTERVAL = 0.03  # seconds between structured-output callbacks
+STRUCTURED_OUTPUT_FIELDS = ("answer", "confidence", "sources_used", "reasoning")
+WIKIPEDIA_TOOL_NAMES = frozenset(
+    {"wikipedia_search", "wikipedia_get_page", "wikipedia_get_pages"}
+)
+# Output keys appear at the start of the JSON, so only the head is scanned
+STRUCTURED_OUTPUT_SCAN_LENGTH = 256
+_STRUCTURED_OUTPUT_RE = re.compile(
+    '"(?:' + "|".join(map(re.escape, STRUCTURED_OUTPUT_FIELDS)) + ')"',
+    re.IGNORECASE,
+)
 
 
 def _parse_tool_args(args: Any, max_length: int = QUERY_DISPLAY_LENGTH) -> str:
     """Extract query from tool args for display purposes"""
-    try:
-        args_dict = json.loads(args) if isinstance(args, str) else args
-        query = (
-            args_dict.get("query", "N/A")[:max_length]
-            if isinstance(args_dict, dict)
-            else str(args)[:max_length]
-        )
-    except (json.JSONDecodeError, AttributeError, TypeError):
-        query = str(args)[:max_length] if args else "N/A"
-    return query
+    # Fast path: pydantic-ai usually hands over args already decoded
+    if type(args) is dict:
+        query = args.get("query", "N/A")
+        return query[:max_length] if isinstance(query, str) else str(args)[:max_length]
+    if not args:
+        return "N/A"
+    if isinstance(args, str):
+        try:
+            args_dict = orjson.loads(args)
+        except orjson.JSONDecodeError:
+            return args[:max_length]
+        query = args_dict.get("query", "N/A") if type(args_dict) is dict else None
+        return query[:max_length] if isinstance(query, str) else args[:max_length]
+    return str(args)[:max_length]
 
 
 def _create_tool_call_tracker(
@@ -45,34 +63,47 @@ def _create_tool_call_tracker(
 ) -> Callable[[Any, Any], Coroutine[Any, Any, None]]:
     """Create a tool call tracker function that appends to the provided list"""
 
+    def _record(event: FunctionToolCallEvent) -> None:
+        tool_call = {
+            "tool_name": event.part.tool_name,
+            "args": event.part.args,
+        }
+        tool_calls.append(tool_call)
+        # Args are only parsed for the log line, so skip it when not logged
+        if logger.isEnabledFor(logging.INFO):
+            query = _parse_tool_args(event.part.args)
+            logger.info(
+                "Tool Call #%d: %s with query: %s...",
+                len(tool_calls),
+                event.part.tool_name,
+                query,
+            )
+
     async def track_tool_calls(ctx: Any, event: Any) -> None:
-        if hasattr(event, "__aiter__"):
+        # pydantic-ai hands over the whole event stream; handle it inline
+        # rather than awaiting a nested call per event
+        if isinstance(event, AsyncIterable):
             async for sub in event:
-                await track_tool_calls(ctx, sub)
+                if isinstance(sub, FunctionToolCallEvent):
+                    _record(sub)
             return
 
         if isinstance(event, FunctionToolCallEvent):
-            tool_call = {
-                "tool_name": event.part.tool_name,
-                "args": event.part.args,
-            }
-            tool_calls.append(tool_call)
-            query = _parse_tool_args(event.part.args)
-            logger.info(
-                f"Tool Call #{len(tool_calls)}: {event.part.tool_name} with query: {query}..."
-            )
+            _record(event)
 
     return track_tool_calls
 
 
+@lru_cache(maxsize=8)
 def _create_agent(openai_model: str, search_mode: SearchMode) -> Agent:
+    """Build the agent; cached per (model, search mode) as agents are reusable"""
     instructions = get_wikipedia_agent_instructions(search_mode)
     model = OpenAIChatModel(model_name=openai_model, provider=OpenAIProvider())
-    logger.info(f"Using OpenAI model: {openai_model}, search mode: {search_mode}")
+    logger.info("Using OpenAI model: %s, search mode: %s", openai_model, search_mode)
     return Agent(
         name="wikipedia_agent",
         model=model,
-        tools=[wikipedia_search, wikipedia_get_page],
+        tools=[wikipedia_search, wikipedia_get_page, wikipedia_get_pages],
         instructions=instructions,
         output_type=SearchAgentAnswer,
         model_settings=ModelSettings(max_tokens=DEFAULT_MAX_TOKENS),
@@ -82,38 +113,33 @@ def _create_agent(openai_model: str, search_mode: SearchMode) -> Agent:
 
 def _handle_error(e: Exception, tool_calls: List[dict]) -> WikipediaAgentResponse:
     """Convert exception to structured error response"""
-    logger.error(f"Error during agent execution: {e}")
+    logger.error("Error during agent execution: %s", e)
     error_type = type(e).__name__
     error_msg = str(e).lower()
     error_type_lower = error_type.lower()
 
-    # Find matching error category
-    error_config = None
-    for category in ErrorCategory:
-        mapping = ERROR_MAPPINGS[category]
-        keywords = mapping.get("keywords", [])
-        matches_error_msg = any(kw in error_msg for kw in keywords)
-        matches_error_type = any(kw in error_type_lower for kw in keywords)
-        if matches_error_msg or matches_error_type:
-            error_config = mapping
-            break
+    # Match message and type in one pass; the newline keeps keywords from
+    # spanning both parts
+    category = categorize_error(f"{error_msg}\n{error_type_lower}")
+    error_config = ERROR_MAPPINGS[category] if category else None
 
+    # Every field below is an internal string, so validation is skipped
     if error_config:
-        agent_error = AgentError(
+        agent_error = AgentError.model_construct(
             error_type=error_config["error_type"],
             message=error_config["message"],
             suggestion=error_config["suggestion"],
             technical_details=str(e),
         )
     else:
-        agent_error = AgentError(
+        agent_error = AgentError.model_construct(
             error_type=error_type,
             message=f"An error occurred: {error_type}",
             suggestion="Please try again. If the problem persists, check your internet connection and API configuration.",
             technical_details=str(e),
         )
 
-    return WikipediaAgentResponse(
+    return WikipediaAgentResponse.model_construct(
         answer=None,
         tool_calls=tool_calls,
         usage=None,
@@ -122,55 +148,122 @@ def _handle_error(e: Exception, tool_calls: List[dict]) -> WikipediaAgentRespons
 
 
 def _extract_token_usage(usage_obj: Any) -> TokenUsage:
-    return TokenUsage(
-        input_tokens=usage_obj.input_tokens,
-        output_tokens=usage_obj.output_tokens,
-        total_tokens=usage_obj.input_tokens + usage_obj.output_tokens,
+    # Counts come straight from pydantic-ai's usage object, so skip validation
+    input_tokens = usage_obj.input_tokens
+    output_tokens = usage_obj.output_tokens
+    return TokenUsage.model_construct(
+        input_tokens=input_tokens,
+        output_tokens=output_tokens,
+        total_tokens=input_tokens + output_tokens,
     )
 
 
 def _is_structured_output(args_str: str) -> bool:
     """Check if args contain structured output fields"""
-    return any(field in args_str.lower() for field in STRUCTURED_OUTPUT_FIELDS)
+    head = args_str[:STRUCTURED_OUTPUT_SCAN_LENGTH]
+    return _STRUCTURED_OUTPUT_RE.search(head) is not None
+
 
+@dataclass(slots=True)
+class _StreamState:
+    """Structured-output progress carried across streamed parts"""
 
-def _calculate_delta(current_text: str, previous_text: str) -> str:
-    """Calculate delta between current and previous text"""
-    return current_text[len(previous_text) :]
+    previous_len: int = 0
+    tool_call_id: str | None = None
+    is_structured: bool = False
+    # Every snapshot repeats earlier parts, so report each tool call once
+    reported_tool_calls: set[str] = field(default_factory=set)
+
+
+class _DeltaCoalescer:
+    """
+    Join structured-output deltas so the callback fires at most once per interval.
+
+    Flushing happens inline in push (the first delta goes out immediately), so
+    callback errors propagate to the caller instead of a loop timer.
+    """
+
+    def __init__(self, callback: Callable[[str], None], interval: float) -> None:
+        self._callback = callback
+        self._interval = interval
+        self._pending: list[str] = []
+        self._last_flush = float("-inf")
+
+    def push(self, delta: str) -> None:
+        self._pending.append(delta)
+        if time.monotonic() - self._last_flush >= self._interval:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._pending:
+            delta = "".join(self._pending)
+            self._pending.clear()
+            self._last_flush = time.monotonic()
+            self._callback(delta)
+
+
+def _tool_args_complete(args: Any) -> bool:
+    """Check whether streamed tool args have been received in full"""
+    if isinstance(args, str):
+        try:
+            orjson.loads(args)
+        except orjson.JSONDecodeError:
+            return False
+        return True
+    return args is not None
 
 
 def _process_streaming_part(
     part: Any,
     tool_call_callback: Callable[[str, str], None] | None,
     structured_output_callback: Callable[[str], None] | None,
-    previous_text: str,
-) -> tuple[str, bool]:
+    state: _StreamState,
+) -> bool:
     """
-    Process a single streaming part.
-    Returns: (updated_previous_text, handled)
+    Process a single streaming part, updating state in place.
+    Returns: whether the part was handled
     """
-    if not hasattr(part, "tool_name"):
-        return previous_text, False
+    if not isinstance(part, BaseToolCallPart):
+        return False
 
     tool_name = part.tool_name
+    if not tool_name:
+        return False
     args = part.args
 
     # Handle Wikipedia tool calls
-    if tool_name in {"wikipedia_search", "wikipedia_get_page"}:
-        if tool_call_callback:
+    if tool_name in WIKIPEDIA_TOOL_NAMES:
+        call_id = part.tool_call_id
+        if (
+            tool_call_callback
+            and call_id not in state.reported_tool_calls
+            and _tool_args_complete(args)
+        ):
+            state.reported_tool_calls.add(call_id)
             tool_call_callback(tool_name, args)
-        return previous_text, True
+        return True
 
     # Handle structured output
-    if tool_name and args:
-        args_str = args if isinstance(args, str) else json.dumps(args)
-        if _is_structured_output(args_str):
-            delta = _calculate_delta(args_str, previous_text)
+    if args:
+        # A new call (e.g. an output-validation retry of final_result) starts
+        # a fresh args stream
+        if part.tool_call_id != state.tool_call_id:
+            state.tool_call_id = part.tool_call_id
+            state.is_structured = False
+            state.previous_len = 0
+        # Streamed args are usually already a string; only dicts need encoding
+        args_str = args if isinstance(args, str) else orjson.dumps(args).decode()
+        # Once a tool's args are known to be the answer, stop re-checking them
+        if not state.is_structured:
+            state.is_structured = _is_structured_output(args_str)
+        if state.is_structured:
+            delta = args_str[state.previous_len :]
             if structured_output_callback and delta:
                 structured_output_callback(delta)
-            return args_str, True
+            state.previous_len = len(args_str)
+            return True
 
-    return previous_text, False
+    return False
 
 
 async def query_wikipedia(
@@ -183,8 +276,9 @@ async def query_wikipedia(
     tool_calls: List[dict] = []
     if agent is None:
         agent = _create_agent(openai_model, search_mode)
+    # %.*s truncates inside the logging call, only if the record is emitted
     logger.info(
-        f"Running Wikipedia agent query: {question[:MAX_QUESTION_LOG_LENGTH]}..."
+        "Running Wikipedia agent query: %.*s...", MAX_QUESTION_LOG_LENGTH, question
     )
 
     try:
@@ -193,10 +287,13 @@ async def query_wikipedia(
     except Exception as e:
         return _handle_error(e, tool_calls)
 
-    logger.info(f"Agent completed query. Tool calls: {len(tool_calls)}")
+    logger.info("Agent completed query. Tool calls: %d", len(tool_calls))
     usage = _extract_token_usage(result.usage())
     logger.info(
-        f"Token usage - Input: {usage.input_tokens}, Output: {usage.output_tokens}, Total: {usage.total_tokens}"
+        "Token usage - Input: %d, Output: %d, Total: %d",
+        usage.input_tokens,
+        usage.output_tokens,
+        usage.total_tokens,
     )
     return WikipediaAgentResponse(
         answer=result.output,
@@ -218,31 +315,43 @@ async def query_wikipedia_stream(
     if agent is None:
         agent = _create_agent(openai_model, search_mode)
     logger.info(
-        f"Running Wikipedia agent query with streaming: {question[:MAX_QUESTION_LOG_LENGTH]}..."
+        "Running Wikipedia agent query with streaming: %.*s...",
+        MAX_QUESTION_LOG_LENGTH,
+        question,
+    )
+    stream_state = _StreamState()
+    coalescer = (
+        _DeltaCoalescer(structured_output_callback, STREAM_COALESCE_INTERVAL)
+        if structured_output_callback
+        else None
     )
-    previous_text = ""
 
     try:
         track_handler = _create_tool_call_tracker(tool_calls)
         async with agent.run_stream(
             question, event_stream_handler=track_handler
         ) as result:
-            async for item, last in result.stream_responses(
-                debounce_by=STREAM_DEBOUNCE
-            ):
+            # Deltas are coalesced below, so don't also debounce the stream
+            debounce_by = None if structured_output_callback else STREAM_DEBOUNCE
+            async for item, last in result.stream_responses(debounce_by=debounce_by):
                 for part in item.parts:
-                    previous_text, _ = _process_streaming_part(
+                    _process_streaming_part(
                         part,
                         tool_call_callback,
-                        structured_output_callback,
-                        previous_text,
+                        coalescer.push if coalescer else None,
+                        stream_state,
                     )
+            # Deliver the tail of the answer; callback errors are handled below
+            if coalescer:
+                coalescer.flush()
 
             final_output = await result.get_output()
             usage = _extract_token_usage(result.usage())
-            logger.info(
-                f"📊 Token Usage - Input: {usage.input_tokens:,}, Output: {usage.output_tokens:,}, Total: {usage.total_tokens:,}"
-            )
+            # Thousands separators need str.format, so guard the f-string instead
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(
+                    f"📊 Token Usage - Input: {usage.input_tokens:,}, Output: {usage.output_tokens:,}, Total: {usage.total_tokens:,}"
+                )
             return WikipediaAgentResponse(
                 answer=final_output,
                 tool_calls=tool_calls,